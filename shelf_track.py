@@ -1,15 +1,114 @@
+import atexit
+import itertools
+import re
 import sqlite3
 
+# ===============================
+# INPUT VALIDATION PATTERNS
+# ===============================
+# Compiled once so bad input is rejected with a cheap match instead of
+# raising and catching a ValueError from int().
+
+# New book IDs must be 4 digits; lookups accept any bounded whole number so
+# books stored before that rule (e.g. id 42) can still be updated or deleted
+_ID_RE = re.compile(r'^\d{4}$')
+_LOOKUP_ID_RE = re.compile(r'^\d{1,9}$')
+
+# Quantities are capped at 9 digits so they always fit SQLite's 64-bit INTEGER
+_QTY_RE = re.compile(r'^\d{1,9}$')
+
+# One bulk-entry line: ID, Title, Author ID, Quantity (titles may contain commas)
+_BULK_LINE_RE = re.compile(r'^(\d{4})\s*,(.+),\s*(\d{4})\s*,\s*(\d{1,9})$')
+
+# ===============================
+# SQL STATEMENTS
+# ===============================
+# Kept as module-level constants so every call passes the identical SQL text
+# and sqlite3's per-connection statement cache can reuse the prepared form.
+
+SQL_INSERT_AUTHOR = "INSERT INTO author VALUES (?, ?, ?)"
+SQL_INSERT_BOOK = "INSERT INTO book VALUES (?, ?, ?, ?)"
+SQL_UPDATE_QTY = "UPDATE book SET qty = ? WHERE id = ?"
+SQL_UPDATE_TITLE = "UPDATE book SET title = ? WHERE id = ?"
+SQL_UPDATE_AUTHOR_ID = "UPDATE book SET authorID = ? WHERE id = ?"
+SQL_SELECT_BOOK_AUTHOR = '''
+    SELECT a.name, a.country FROM author a
+    JOIN book b ON a.id = b.authorID
+    WHERE b.id = ?
+'''
+# Blank input keeps the current value; the author is found through the book
+SQL_UPDATE_BOOK_AUTHOR = '''
+    UPDATE author
+    SET name = COALESCE(NULLIF(?, ''), name),
+        country = COALESCE(NULLIF(?, ''), country)
+    WHERE id = (SELECT authorID FROM book WHERE id = ?)
+'''
+SQL_DELETE_BOOK = "DELETE FROM book WHERE id = ?"
+SQL_SEARCH_ALL = "SELECT id, title, authorID, qty FROM book"
+SQL_SEARCH_GLOB = "SELECT id, title, authorID, qty FROM book WHERE title GLOB ?"
+SQL_SEARCH_FTS = '''
+    SELECT b.id, b.title, b.authorID, b.qty FROM book_fts f
+    JOIN book b ON b.id = f.rowid
+    WHERE book_fts MATCH ?
+'''
+SQL_VIEW_ALL = '''
+    SELECT b.title, a.name, a.country
+    FROM book b
+    INNER JOIN author a ON b.authorID = a.id
+'''
+
 # ===============================
 # DATABASE CONNECTION UTILITIES
 # ===============================
 
+DB_NAME = "ebookstore.db"
+
+# Bump whenever create_tables()/populate_tables() change so they run again
+# on existing databases at their next start. That re-creates indexes,
+# triggers and FTS objects, but CREATE TABLE IF NOT EXISTS never alters an
+# existing table, so column or constraint changes need their own migration.
+SCHEMA_VERSION = 4
+
+# Single connection shared by every menu action for the life of the process
+_CONN = None
+
+
 def connect_db():
     """
-    Establish and return a connection to the 'ebookstore' database.
-    Using 'with' statements ensures the connection is safely managed.
+    Return the shared connection to the 'ebookstore' database, opening and
+    configuring it on first use. Using 'with' statements scopes each
+    transaction (commit on success, rollback on error) without closing it.
+    The file database is switched to WAL journal mode so that commits append
+    to the log and readers are not blocked by writers.
     """
-    return sqlite3.connect("ebookstore.db")
+    global _CONN
+    if _CONN is not None:
+        return _CONN
+
+    # Autocommit mode: writers open their own BEGIN IMMEDIATE transactions
+    conn = sqlite3.connect(DB_NAME, isolation_level=None)
+    atexit.register(conn.close)
+
+    if DB_NAME != ":memory:":
+        conn.execute("PRAGMA journal_mode=WAL")
+
+    # Apply the remaining per-connection settings in one script
+    conn.executescript("""
+        -- Under WAL, NORMAL only syncs at checkpoints and stays crash-consistent
+        PRAGMA synchronous=NORMAL;
+        -- Keep the working set in a 64 MiB page cache and sort/join scratch in RAM
+        PRAGMA cache_size=-65536;
+        PRAGMA temp_store=MEMORY;
+        -- Memory-map up to 256 MB of the file so page reads skip read() copies
+        PRAGMA mmap_size=268435456;
+        -- SQLite leaves foreign key enforcement off unless asked per connection
+        PRAGMA foreign_keys=ON;
+        -- Wait for a competing writer's lock instead of failing with SQLITE_BUSY
+        PRAGMA busy_timeout=5000;
+    """)
+
+    _CONN = conn
+    return conn
 
 
 def create_tables():
@@ -19,6 +118,7 @@ def create_tables():
     """
     with connect_db() as conn:
         cursor = conn.cursor()
+        cursor.execute("BEGIN IMMEDIATE")
 
         # Create the 'author' table to store author details.
         cursor.execute('''
@@ -37,9 +137,54 @@ def create_tables():
                 authorID INTEGER NOT NULL,
                 qty INTEGER NOT NULL,
                 FOREIGN KEY (authorID) REFERENCES author(id)
+                    ON UPDATE CASCADE ON DELETE RESTRICT
             )
         ''')
 
+        # Index the foreign key so author/book joins use lookups, not scans
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_book_authorID ON book(authorID)")
+
+        # The old case-insensitive title index served no query once prefix
+        # search moved to GLOB and keyword search to FTS5, so remove it
+        cursor.execute("DROP INDEX IF EXISTS idx_book_title")
+
+        # Covering index (the rowid 'id' is stored implicitly) so title
+        # lookups can be answered without touching the main table
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_book_title_cover ON book(title, authorID, qty)")
+
+        # Full-text index over book titles, kept in sync with 'book' by triggers.
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'book_fts'")
+        fts_exists = cursor.fetchone() is not None
+
+        cursor.execute('''
+            CREATE VIRTUAL TABLE IF NOT EXISTS book_fts
+            USING fts5(title, content='book', content_rowid='id')
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS book_fts_insert AFTER INSERT ON book BEGIN
+                INSERT INTO book_fts(rowid, title) VALUES (new.id, new.title);
+            END
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS book_fts_delete AFTER DELETE ON book BEGIN
+                INSERT INTO book_fts(book_fts, rowid, title) VALUES ('delete', old.id, old.title);
+            END
+        ''')
+        # Only re-index when the indexed columns change, not on quantity or
+        # author updates. Dropped first so older databases pick up the
+        # narrower trigger.
+        cursor.execute("DROP TRIGGER IF EXISTS book_fts_update")
+        cursor.execute('''
+            CREATE TRIGGER book_fts_update AFTER UPDATE OF id, title ON book BEGIN
+                INSERT INTO book_fts(book_fts, rowid, title) VALUES ('delete', old.id, old.title);
+                INSERT INTO book_fts(rowid, title) VALUES (new.id, new.title);
+            END
+        ''')
+
+        # Index any books that were stored before the full-text table existed
+        if not fts_exists:
+            cursor.execute("INSERT INTO book_fts(book_fts) VALUES ('rebuild')")
+
         conn.commit()  # Save table creation changes
 
 
@@ -54,9 +199,14 @@ def populate_tables():
     with connect_db() as conn:
         cursor = conn.cursor()
 
-        # Check if author table already has data
-        cursor.execute("SELECT COUNT(*) FROM author")
-        if cursor.fetchone()[0] == 0:
+        # Take the write lock up front so the probes and both seed inserts
+        # run as one transaction and are flushed with a single commit.
+        cursor.execute("BEGIN IMMEDIATE")
+
+        # Check if author table already has data (EXISTS stops at the first
+        # row, where COUNT(*) would scan the whole table)
+        cursor.execute("SELECT EXISTS (SELECT 1 FROM author)")
+        if not cursor.fetchone()[0]:
             authors = [
                 (1290, "Charles Dickens", "England"),
                 (8937, "J.K. Rowling", "England"),
@@ -64,11 +214,11 @@ def populate_tables():
                 (6380, "J.R.R. Tolkien", "South Africa"),
                 (5620, "Lewis Carroll", "England")
             ]
-            cursor.executemany("INSERT INTO author VALUES (?, ?, ?)", authors)
+            cursor.executemany(SQL_INSERT_AUTHOR, authors)
 
         # Check if book table already has data
-        cursor.execute("SELECT COUNT(*) FROM book")
-        if cursor.fetchone()[0] == 0:
+        cursor.execute("SELECT EXISTS (SELECT 1 FROM book)")
+        if not cursor.fetchone()[0]:
             books = [
                 (3001, "A Tale of Two Cities", 1290, 30),
                 (3002, "Harry Potter and the Philosopher's Stone", 8937, 40),
@@ -76,139 +226,273 @@ def populate_tables():
                 (3004, "The Lord of the Rings", 6380, 37),
                 (3005, "Alice's Adventures in Wonderland", 5620, 12)
             ]
-            cursor.executemany("INSERT INTO book VALUES (?, ?, ?, ?)", books)
+            cursor.executemany(SQL_INSERT_BOOK, books)
 
         conn.commit()
 
 
+def setup_database():
+    """
+    Create and seed the database on first run only. The schema version is
+    recorded in SQLite's 'user_version' header field, so warm starts skip
+    the schema and seeding work entirely.
+    """
+    conn = connect_db()
+    if conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION:
+        return
+
+    create_tables()
+    populate_tables()
+    conn.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+
+
 # ===============================
 # MENU FUNCTIONALITIES
 # ===============================
 
+def read_int(prompt, pattern):
+    """
+    Prompt for a whole number and return it, or None if the input does not
+    match the given validation pattern.
+    """
+    raw = input(prompt).strip()
+    if not pattern.match(raw):
+        return None
+    return int(raw)
+
+
 def enter_book():
     """Add a new book to the database."""
-    try:
-        # Gather input data from the user
-        id = int(input("Enter book ID (4 digits): "))
-        title = input("Enter book title: ").strip()
-        authorID = int(input("Enter author ID (4 digits): "))
-        qty = int(input("Enter quantity: "))
+    # Gather input data from the user
+    id = read_int("Enter book ID (4 digits): ", _ID_RE)
+    if id is None:
+        print("❌ Book ID must be 4 digits.")
+        return
+    title = input("Enter book title: ").strip()
+    authorID = read_int("Enter author ID (4 digits): ", _ID_RE)
+    if authorID is None:
+        print("❌ Author ID must be 4 digits.")
+        return
+    qty = read_int("Enter quantity: ", _QTY_RE)
+    if qty is None:
+        print("❌ Quantity must be a whole number of at most 9 digits.")
+        return
 
+    try:
         # Insert data into the book table
         with connect_db() as conn:
             cursor = conn.cursor()
-            cursor.execute("INSERT INTO book VALUES (?, ?, ?, ?)", (id, title, authorID, qty))
+            cursor.execute("BEGIN IMMEDIATE")
+            cursor.execute(SQL_INSERT_BOOK, (id, title, authorID, qty))
             conn.commit()
             print(f"\n✅ Book '{title}' successfully added.\n")
-    except Exception as e:
+    except sqlite3.Error as e:
         print("❌ Error adding book:", e)
 
 
-def update_book():
-    """Update an existing book's information (title, authorID, or quantity)."""
+def bulk_enter_books():
+    """
+    Add several books at once, one per line as: ID, Title, Author ID, Quantity.
+    All rows are inserted in a single transaction, so they share one commit.
+    """
+    print("Enter one book per line as: ID, Title, Author ID, Quantity")
+    print("Press Enter on an empty line when finished.")
+    rows = []
+    while True:
+        try:
+            line = input().strip()
+        except EOFError:
+            break
+        if not line:
+            break
+
+        match = _BULK_LINE_RE.match(line)
+        if not match:
+            print(f"⚠️ Skipping badly formatted line: {line}")
+            continue
+        id, title, authorID, qty = match.groups()
+        rows.append((int(id), title.strip(), int(authorID), int(qty)))
+
+    if not rows:
+        print("⚠️ No books entered.")
+        return
+
     try:
-        book_id = int(input("Enter the ID of the book to update: "))
+        with connect_db() as conn:
+            cursor = conn.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+            cursor.executemany(SQL_INSERT_BOOK, rows)
+            conn.commit()
+            print(f"\n✅ {len(rows)} book(s) successfully added.\n")
+    except sqlite3.Error as e:
+        print("❌ Error adding books:", e)
+
 
-        # Display update options to the user
-        print("\nUpdate Options:")
-        print("1. Quantity")
-        print("2. Title")
-        print("3. Author ID")
-        print("4. Author Name/Country")
-        choice = input("Enter your choice (1-4): ")
+def update_book():
+    """Update an existing book's information (title, authorID, or quantity)."""
+    book_id = read_int("Enter the ID of the book to update: ", _LOOKUP_ID_RE)
+    if book_id is None:
+        print("❌ Book ID must be a whole number of at most 9 digits.")
+        return
+
+    # Display update options to the user
+    print("\nUpdate Options:")
+    print("1. Quantity")
+    print("2. Title")
+    print("3. Author ID")
+    print("4. Author Name/Country")
+    choice = input("Enter your choice (1-4): ")
 
+    try:
         with connect_db() as conn:
             cursor = conn.cursor()
 
+            # Each option takes the write lock only once its input is read,
+            # so the database is never locked while waiting on the clerk.
+
             # Option 1: Update quantity
             if choice == "1":
-                qty = int(input("Enter new quantity: "))
-                cursor.execute("UPDATE book SET qty = ? WHERE id = ?", (qty, book_id))
+                qty = read_int("Enter new quantity: ", _QTY_RE)
+                if qty is None:
+                    print("❌ Quantity must be a whole number of at most 9 digits.")
+                    return
+                cursor.execute("BEGIN IMMEDIATE")
+                cursor.execute(SQL_UPDATE_QTY, (qty, book_id))
 
             # Option 2: Update title
             elif choice == "2":
                 title = input("Enter new title: ")
-                cursor.execute("UPDATE book SET title = ? WHERE id = ?", (title, book_id))
+                cursor.execute("BEGIN IMMEDIATE")
+                cursor.execute(SQL_UPDATE_TITLE, (title, book_id))
 
             # Option 3: Update author ID
             elif choice == "3":
-                authorID = int(input("Enter new author ID: "))
-                cursor.execute("UPDATE book SET authorID = ? WHERE id = ?", (authorID, book_id))
+                authorID = read_int("Enter new author ID: ", _ID_RE)
+                if authorID is None:
+                    print("❌ Author ID must be 4 digits.")
+                    return
+                cursor.execute("BEGIN IMMEDIATE")
+                cursor.execute(SQL_UPDATE_AUTHOR_ID, (authorID, book_id))
 
             # Option 4: Update author details (name and country)
             elif choice == "4":
-                cursor.execute('''
-                    SELECT a.id, a.name, a.country FROM author a
-                    JOIN book b ON a.id = b.authorID
-                    WHERE b.id = ?
-                ''', (book_id,))
-                author = cursor.fetchone()
-
-                if author:
-                    print(f"\nCurrent Author: {author[1]} ({author[2]})")
-                    new_name = input("Enter new author name (leave blank to keep current): ").strip() or author[1]
-                    new_country = input("Enter new country (leave blank to keep current): ").strip() or author[2]
-
-                    cursor.execute("UPDATE author SET name = ?, country = ? WHERE id = ?", (new_name, new_country, author[0]))
-                else:
+                # The current details are only fetched when asked for, so the
+                # default path is the single UPDATE below.
+                preview = input("Show current author details first? (y/N): ").strip().lower() == "y"
+                if preview:
+                    cursor.execute(SQL_SELECT_BOOK_AUTHOR, (book_id,))
+                    author = cursor.fetchone()
+                    if not author:
+                        print("❌ Author not found for this book.")
+                        return
+                    print(f"\nCurrent Author: {author[0]} ({author[1]})")
+
+                new_name = input("Enter new author name (leave blank to keep current): ").strip()
+                new_country = input("Enter new country (leave blank to keep current): ").strip()
+
+                cursor.execute("BEGIN IMMEDIATE")
+                cursor.execute(SQL_UPDATE_BOOK_AUTHOR, (new_name, new_country, book_id))
+                if cursor.rowcount == 0:
                     print("❌ Author not found for this book.")
+                    return
             else:
                 print("⚠️ Invalid choice.")
 
             conn.commit()
             print("\n✅ Book/Author updated successfully.\n")
 
-    except Exception as e:
+    except sqlite3.Error as e:
         print("❌ Error updating book:", e)
 
 
 def delete_book():
     """Remove a book record from the database."""
+    book_id = read_int("Enter the ID of the book to delete: ", _LOOKUP_ID_RE)
+    if book_id is None:
+        print("❌ Book ID must be a whole number of at most 9 digits.")
+        return
+
     try:
-        book_id = int(input("Enter the ID of the book to delete: "))
         with connect_db() as conn:
             cursor = conn.cursor()
-            cursor.execute("DELETE FROM book WHERE id = ?", (book_id,))
+            cursor.execute("BEGIN IMMEDIATE")
+            cursor.execute(SQL_DELETE_BOOK, (book_id,))
             conn.commit()
             print(f"\n🗑️ Book with ID {book_id} deleted successfully.\n")
-    except Exception as e:
+    except sqlite3.Error as e:
         print("❌ Error deleting book:", e)
 
 
+def fts_prefix_query(keyword):
+    """
+    Turn free-text user input into an FTS5 query that prefix-matches every word.
+    Each word is quoted so punctuation is not read as FTS5 query syntax.
+    """
+    return " ".join('"' + word.replace('"', '""') + '"*' for word in keyword.split())
+
+
+def glob_prefix_pattern(keyword):
+    """
+    Turn user input into a GLOB pattern matching titles that start with it.
+    GLOB wildcards in the input are wrapped in brackets so they match literally.
+    """
+    return "".join(f"[{ch}]" if ch in "*?[" else ch for ch in keyword) + "*"
+
+
 def search_books():
-    """Search for books by title (partial match allowed)."""
+    """
+    Search for books by title, either by the start of the title or by
+    keywords anywhere in it (words may be partial, e.g. 'lor' finds 'Lord').
+    """
+    print("\nSearch Options:")
+    print("1. Title starts with (case-sensitive, fastest)")
+    print("2. Keywords anywhere in title")
+    mode = input("Enter your choice (1-2): ").strip()
+    if mode not in ("1", "2"):
+        print("⚠️ Invalid choice.")
+        return
     keyword = input("Enter a keyword to search for: ").strip()
     with connect_db() as conn:
         cursor = conn.cursor()
-        cursor.execute("SELECT * FROM book WHERE title LIKE ?", ('%' + keyword + '%',))
-        results = cursor.fetchall()
 
-        if results:
-            print("\n🔎 Search Results:")
-            for row in results:
-                print(f"ID: {row[0]}, Title: {row[1]}, Author ID: {row[2]}, Quantity: {row[3]}")
+        # Prefix search uses GLOB, whose binary comparison matches the default
+        # collation of idx_book_title_cover, so SQLite can seek straight to the
+        # matching range of that covering index. Keyword search uses the
+        # full-text index; an empty keyword has nothing to MATCH, so it simply
+        # lists every book.
+        if mode == "1":
+            cursor.execute(SQL_SEARCH_GLOB, (glob_prefix_pattern(keyword),))
+        elif keyword:
+            cursor.execute(SQL_SEARCH_FTS, (fts_prefix_query(keyword),))
         else:
+            cursor.execute(SQL_SEARCH_ALL)
+
+        # The first row tells us if anything matched; the rest are read from
+        # the cursor and written out with a single print call.
+        first = cursor.fetchone()
+        if first is None:
             print("❌ No books found with that keyword.")
+            return
+
+        print("\n🔎 Search Results:")
+        print("\n".join(
+            f"ID: {id}, Title: {title}, Author ID: {authorID}, Quantity: {qty}"
+            for id, title, authorID, qty in itertools.chain([first], cursor)
+        ))
 
 
 def view_all_books():
     """Display all book details, including author name and country."""
     with connect_db() as conn:
         cursor = conn.cursor()
-        cursor.execute('''
-            SELECT b.title, a.name, a.country
-            FROM book b
-            INNER JOIN author a ON b.authorID = a.id
-        ''')
-        results = cursor.fetchall()
+        cursor.execute(SQL_VIEW_ALL)
 
+        # Build the whole listing and write it with a single print call
         print("\n📚 Book Details:")
-        for title, name, country in results:
-            print(f"""
-Title: {title}
-Author's Name: {name}
-Author's Country: {country}
-            """)
+        print("\n".join(
+            f"\nTitle: {title}\nAuthor's Name: {name}\nAuthor's Country: {country}\n"
+            for title, name, country in cursor
+        ))
 
 
 # ===============================
@@ -217,8 +501,7 @@ Author's Country: {country}
 
 def main():
     """Main menu that allows the clerk to interact with the system."""
-    create_tables()
-    populate_tables()
+    setup_database()
 
     while True:
         print("\n====== EBOOKSTORE MENU ======")
@@ -227,6 +510,7 @@ def main():
         print("3. Delete book")
         print("4. Search books")
         print("5. View details of all books")
+        print("6. Bulk enter books")
         print("0. Exit")
 
         choice = input("\nEnter your choice: ")
@@ -241,7 +525,21 @@ def main():
             search_books()
         elif choice == "5":
             view_all_books()
+        elif choice == "6":
+            bulk_enter_books()
         elif choice == "0":
+            # Refresh planner statistics, then fold the WAL back into the
+            # database file and truncate it before the connection is closed.
+            # Each step is attempted on its own and neither blocks exit.
+            conn = connect_db()
+            try:
+                conn.execute("PRAGMA optimize")
+            except sqlite3.Error as e:
+                print("⚠️ Could not optimize the database:", e)
+            try:
+                conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            except sqlite3.Error as e:
+                print("⚠️ Could not checkpoint the database:", e)
             print("👋 Goodbye! Have a great day.")
             break
         else: